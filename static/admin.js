@@ -0,0 +1,819 @@
+let STATE = { universe:1, fixtures:[], defaults:{dimmer:255,strobe:0}, buttons:[] };
+
+function el(id){ return document.getElementById(id); }
+function status(msg){ el('status').textContent = msg; setTimeout(()=>el('status').textContent="", 2500); }
+
+// Bursts (Farbregler ziehen) zu einem Aufruf nach ms Ruhe zusammenfassen
+function debounce(fn, ms){
+  let t;
+  const f = (...a) => { clearTimeout(t); t = setTimeout(() => fn(...a), ms); };
+  f.cancel = () => clearTimeout(t);
+  return f;
+}
+
+function hexToRgb(hex){ const v=hex.replace('#',''); const n=parseInt(v,16); return {r:(n>>16)&255,g:(n>>8)&255,b:n&255}; }
+// Byte → zweistelliges Hex, einmal vorberechnet
+const _HEX = Array.from({length:256}, (_,i)=>(i<16?'0':'')+i.toString(16));
+function rgbToHex(r,g,b){ return '#'+_HEX[r&255]+_HEX[g&255]+_HEX[b&255]; }
+
+// Wiederholt gerenderte Bausteine als <template> (siehe admin.html)
+const TPL_COLOR_ROW = el('tpl-color-row').content.firstElementChild;
+const TPL_SEQ_CTRL  = el('tpl-seq-ctrl').content.firstElementChild;
+const TPL_SEQ_STEP  = el('tpl-seq-step').content.firstElementChild;
+
+// ===== ERWEITERT: colorRow mit Amber (A) Support =====
+// Änderungen landen direkt in owner[key]; die Eingaben behandelt onColorInput per Delegation
+function colorRow(title, owner, key){
+  const obj=owner[key];
+  const r=obj.r|0, g=obj.g|0, b=obj.b|0, w=obj.w|0, a=obj.a|0;
+  // Template klonen statt innerHTML parsen; nur die variablen Felder setzen
+  const wrap=TPL_COLOR_ROW.cloneNode(true);
+  wrap._owner=owner;
+  wrap._key=key;
+  // Eingabe-Elemente einmal suchen; onColorInput greift bei jedem Slider-Tick direkt darauf zu
+  wrap._pick=wrap.querySelector('.pick');
+  wrap._wsl=wrap.querySelector('.wslider');
+  wrap._asl=wrap.querySelector('.aslider');
+  wrap._wVal=wrap.querySelector('.w-val');
+  wrap._aVal=wrap.querySelector('.a-val');
+  wrap.querySelector('.cr-title').textContent=title;
+  wrap.querySelector('.cr-rgb').textContent=`R:${r} G:${g} B:${b}`;
+  wrap._pick.value=rgbToHex(r,g,b);
+  wrap._wsl.value=w;
+  wrap._wVal.textContent=w;
+  wrap._asl.value=a;
+  wrap._aVal.textContent=a;
+  return wrap;
+}
+
+function onColorInput(wrap){
+  const {r,g,b}=hexToRgb(wrap._pick.value);
+  const newW = parseInt(wrap._wsl.value);
+  const newA = parseInt(wrap._asl.value);
+  // sofort ins Modell: Save/Test/PNG-Export direkt danach sehen den neuen Wert
+  wrap._owner[wrap._key]={r,g,b,w:newW,a:newA};
+  wrap._wVal.textContent = newW;
+  wrap._aVal.textContent = newA;
+}
+
+// StreamDeck Image Generator (72x72 px)
+// eine Zeichenfläche samt Kontext für alle Exporte (OffscreenCanvas, falls vorhanden)
+let _sdCanvas = null, _sdCtx = null;
+
+function generateStreamDeckImage(button, names){
+  if (!_sdCanvas){
+    if (typeof OffscreenCanvas !== 'undefined'){
+      _sdCanvas = new OffscreenCanvas(72, 72);
+    } else {
+      _sdCanvas = document.createElement('canvas');
+      _sdCanvas.width = 72;
+      _sdCanvas.height = 72;
+    }
+    _sdCtx = _sdCanvas.getContext('2d');
+  }
+  const canvas = _sdCanvas, ctx = _sdCtx;
+  ctx.save();
+  ctx.clearRect(0, 0, 72, 72);
+
+  const scene = button.scene || {type:'blackout'};
+  const colors = [];
+  // per-fixture: nur Werte aktueller Fixtures, verwaiste Schlüssel werden nicht abgespielt
+  const perFixture = vals => names.forEach(n => {
+    const c = vals[n];
+    if (c) colors.push({r:c.r||0, g:c.g||0, b:c.b||0});
+  });
+
+  const t = (scene.type || 'blackout').toLowerCase();
+  if (t === 'blackout'){
+    colors.push({r:0,g:0,b:0});
+  } else if (t === 'static'){
+    const c = scene.all || {r:0,g:0,b:0};
+    colors.push({r:c.r||0, g:c.g||0, b:c.b||0});
+  } else if (t === 'per-fixture'){
+    perFixture(scene.values || {});
+  } else if (t === 'sequence'){
+    const steps = scene.steps || [];
+    steps.forEach(st => {
+      if (st.all){
+        colors.push({r:st.all.r||0, g:st.all.g||0, b:st.all.b||0});
+      } else if (st.values){
+        perFixture(st.values);
+      }
+    });
+  }
+
+  if (colors.length === 0) colors.push({r:0,g:0,b:0});
+
+  if (colors.length === 1){
+    ctx.fillStyle = `rgb(${colors[0].r},${colors[0].g},${colors[0].b})`;
+    ctx.fillRect(0, 0, 72, 72);
+  } else if (colors.length === 2){
+    ctx.fillStyle = `rgb(${colors[0].r},${colors[0].g},${colors[0].b})`;
+    ctx.fillRect(0, 0, 36, 72);
+    ctx.fillStyle = `rgb(${colors[1].r},${colors[1].g},${colors[1].b})`;
+    ctx.fillRect(36, 0, 36, 72);
+  } else if (colors.length <= 4){
+    const gridSize = Math.ceil(Math.sqrt(colors.length));
+    const cellW = 72 / gridSize;
+    const cellH = 72 / gridSize;
+    colors.forEach((c, i) => {
+      const x = (i % gridSize) * cellW;
+      const y = Math.floor(i / gridSize) * cellH;
+      ctx.fillStyle = `rgb(${c.r},${c.g},${c.b})`;
+      ctx.fillRect(x, y, cellW, cellH);
+    });
+  } else {
+    const grad = ctx.createLinearGradient(0, 0, 0, 72);
+    colors.forEach((c, i) => grad.addColorStop(i / (colors.length - 1), `rgb(${c.r},${c.g},${c.b})`));
+    ctx.fillStyle = grad;
+    ctx.fillRect(0, 0, 72, 72);
+  }
+
+  ctx.fillStyle = '#fff';
+  ctx.font = 'bold 10px sans-serif';
+  ctx.textAlign = 'center';
+  ctx.textBaseline = 'middle';
+  ctx.shadowColor = 'rgba(0,0,0,0.8)';
+  ctx.shadowBlur = 3;
+  ctx.fillText(button.label || 'Scene', 36, 36);
+  ctx.restore();  // Schatten/Font nicht ins nächste Bild übernehmen
+
+  return canvas;
+}
+
+// ===== Palette-PNG: StreamDeck-Bilder haben meist nur wenige Farben =====
+// ≤256 Farben → indiziertes PNG mit minimaler Bittiefe (1/2/4/8 Bit) statt 32-Bit RGBA
+function makeCrcTable(){
+  const t = new Uint32Array(256);
+  for (let n = 0; n < 256; n++){
+    let c = n;
+    for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+    t[n] = c >>> 0;
+  }
+  return t;
+}
+const _CRC_TABLE = makeCrcTable();
+
+function crc32(bytes){
+  let c = 0xFFFFFFFF;
+  for (let i = 0; i < bytes.length; i++) c = _CRC_TABLE[(c ^ bytes[i]) & 255] ^ (c >>> 8);
+  return (c ^ 0xFFFFFFFF) >>> 0;
+}
+
+function pngChunk(type, data){
+  const out = new Uint8Array(12 + data.length);
+  const dv = new DataView(out.buffer);
+  dv.setUint32(0, data.length);
+  for (let i = 0; i < 4; i++) out[4 + i] = type.charCodeAt(i);
+  out.set(data, 8);
+  dv.setUint32(8 + data.length, crc32(out.subarray(4, 8 + data.length)));
+  return out;
+}
+
+// null, wenn das Bild mehr als 256 Farben hat
+async function encodePalettePng(img){
+  const {width: w, height: h, data} = img;
+  const palette = new Map();       // RGBA als uint32 → Palettenindex
+  const px = new Uint8Array(w * h);
+  for (let i = 0, p = 0; i < data.length; i += 4, p++){
+    const key = ((data[i] << 24) | (data[i+1] << 16) | (data[i+2] << 8) | data[i+3]) >>> 0;
+    let k = palette.get(key);
+    if (k === undefined){
+      k = palette.size;
+      if (k === 256) return null;
+      palette.set(key, k);
+    }
+    px[p] = k;
+  }
+
+  const n = palette.size;
+  const depth = n <= 2 ? 1 : n <= 4 ? 2 : n <= 16 ? 4 : 8;
+  const stride = Math.ceil(w * depth / 8);
+  const raw = new Uint8Array((stride + 1) * h);   // je Zeile Filterbyte 0 + gepackte Indizes
+  for (let y = 0; y < h; y++){
+    const row = y * (stride + 1) + 1;
+    for (let x = 0; x < w; x++){
+      const bit = x * depth;
+      raw[row + (bit >> 3)] |= px[y * w + x] << (8 - depth - (bit & 7));
+    }
+  }
+
+  const plte = new Uint8Array(n * 3), trns = new Uint8Array(n);
+  let opaque = true;
+  for (const [key, k] of palette){
+    plte[k*3] = key >>> 24; plte[k*3+1] = (key >>> 16) & 255; plte[k*3+2] = (key >>> 8) & 255;
+    trns[k] = key & 255;
+    if (trns[k] !== 255) opaque = false;
+  }
+  const ihdr = new Uint8Array(13);
+  const dv = new DataView(ihdr.buffer);
+  dv.setUint32(0, w); dv.setUint32(4, h);
+  ihdr[8] = depth; ihdr[9] = 3;                  // Farbtyp 3 = Palette
+
+  const zstream = new Blob([raw]).stream().pipeThrough(new CompressionStream('deflate'));
+  const idat = new Uint8Array(await new Response(zstream).arrayBuffer());
+
+  const parts = [new Uint8Array([137,80,78,71,13,10,26,10]), pngChunk('IHDR', ihdr), pngChunk('PLTE', plte)];
+  if (!opaque) parts.push(pngChunk('tRNS', trns));
+  parts.push(pngChunk('IDAT', idat), pngChunk('IEND', new Uint8Array(0)));
+  return new Blob(parts, {type: 'image/png'});
+}
+
+async function canvasToPngBlob(canvas){
+  if (typeof CompressionStream !== 'undefined'){
+    // getImageData vor dem ersten await: das Bild ist gesichert, bevor die Fläche neu bemalt wird
+    const img = canvas.getContext('2d').getImageData(0, 0, canvas.width, canvas.height);
+    const blob = await encodePalettePng(img);
+    if (blob) return blob;
+  }
+  if (canvas.convertToBlob) return canvas.convertToBlob({type:'image/png'});
+  return new Promise(resolve => canvas.toBlob(resolve, 'image/png'));
+}
+
+// ===== StreamDeck-Export im Worker: Zeichnen + PNG-Kodierung blockieren die Oberfläche nicht =====
+// Der Worker bekommt dieselben Funktionen als Quelltext; ohne Worker/OffscreenCanvas
+// (oder wenn er nicht startet) läuft der Export wie bisher im Hauptthread.
+const _SD_WORKER_FNS = [makeCrcTable, crc32, pngChunk, encodePalettePng, canvasToPngBlob, generateStreamDeckImage];
+let _sdWorker;                    // undefined = noch nicht versucht, null = nicht verfügbar
+let _sdSeq = 0;
+const _sdPending = new Map();     // id → {resolve, reject}
+
+function sdWorker(){
+  if (_sdWorker !== undefined) return _sdWorker;
+  _sdWorker = null;
+  if (typeof Worker === 'undefined' || typeof OffscreenCanvas === 'undefined') return null;
+  const src = _SD_WORKER_FNS.map(String).join('\n') + `
+const _CRC_TABLE = makeCrcTable();
+let _sdCanvas = null, _sdCtx = null;
+onmessage = async e => {
+  const {id, button, names} = e.data;
+  try { postMessage({id, blob: await canvasToPngBlob(generateStreamDeckImage(button, names))}); }
+  catch (err) { postMessage({id, error: String(err)}); }
+};`;
+  const url = URL.createObjectURL(new Blob([src], {type:'text/javascript'}));
+  try {
+    _sdWorker = new Worker(url);
+  } catch (e){
+    return null;                  // z.B. CSP verbietet blob:-Worker
+  } finally {
+    URL.revokeObjectURL(url);     // der Worker hat das Skript beim Erzeugen übernommen
+  }
+  _sdWorker.onmessage = e => {
+    const {id, blob, error} = e.data;
+    const p = _sdPending.get(id);
+    if (!p) return;
+    _sdPending.delete(id);
+    blob ? p.resolve(blob) : p.reject(new Error(error));
+  };
+  _sdWorker.onerror = () => {
+    // Worker unbrauchbar: offene Aufträge fallen auf den Hauptthread zurück
+    _sdWorker.terminate();
+    _sdWorker = null;
+    for (const p of _sdPending.values()) p.reject(new Error('worker failed'));
+    _sdPending.clear();
+  };
+  return _sdWorker;
+}
+
+function streamDeckPng(button){
+  const names = STATE.fixtures.map(f=>f.name);
+  const sync = () => canvasToPngBlob(generateStreamDeckImage(button, names));
+  const w = sdWorker();
+  if (!w) return sync();
+  const id = ++_sdSeq;
+  return new Promise((resolve, reject) => {
+    _sdPending.set(id, {resolve, reject});
+    // nur die fürs Bild nötigen Felder (structured clone)
+    w.postMessage({id, button: {label: button.label, scene: button.scene}, names});
+  }).catch(sync);
+}
+
+function downloadStreamDeckImage(btnEl){
+  const button = cardButton(btnEl);
+
+  streamDeckPng(button).then(blob => {
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = `streamdeck_${button.index}_${(button.label||'scene').replace(/\s+/g,'_')}.png`;
+    a.click();
+    URL.revokeObjectURL(url);
+    status('StreamDeck Bild heruntergeladen');
+  });
+}
+
+// Companion URI (kopiert voller Link inkl Token)
+function buildCompanionUrl(path){
+  const u = new URL(path, window.location.origin);
+  const token = new URLSearchParams(window.location.search).get('token');
+  if (token) u.searchParams.set('token', token);
+  return u.toString();
+}
+
+function copyURI(btnEl){
+  const codeEl = btnEl.parentElement.querySelector('.uri-text');
+  const relative = codeEl.textContent.trim();
+  const full = buildCompanionUrl(relative);
+
+  const setCopied = () => {
+    const orig = btnEl.textContent;
+    btnEl.textContent = '✓ Copied!';
+    setTimeout(()=>btnEl.textContent = orig, 1500);
+  };
+
+  if (navigator.clipboard && navigator.clipboard.writeText) {
+    navigator.clipboard.writeText(full).then(setCopied).catch(() => copyToClipboardFallback(full, btnEl));
+  } else {
+    copyToClipboardFallback(full, btnEl);
+  }
+}
+
+function copyToClipboardFallback(text, btnEl){
+  const textarea = document.createElement('textarea');
+  textarea.value = text;
+  textarea.style.position = 'fixed';
+  textarea.style.opacity = '0';
+  document.body.appendChild(textarea);
+  textarea.select();
+  try {
+    document.execCommand('copy');
+    if (btnEl) {
+      const orig = btnEl.textContent;
+      btnEl.textContent = '✓ Copied!';
+      setTimeout(()=>btnEl.textContent = orig, 1500);
+    }
+  } catch (err) {
+    alert('Kopieren fehlgeschlagen. URI: ' + text);
+  }
+  document.body.removeChild(textarea);
+}
+
+// ===== Rendering =====
+// Änderungen bis zum nächsten Animation-Frame sammeln → höchstens ein Render je Liste und Frame.
+// Handler greifen über node._button/_fixture zu, nicht über die bis dahin evtl. veraltete data-idx.
+const RENDER_FIXTURES = 1, RENDER_BUTTONS = 2;
+let _renderPending = 0;
+
+function scheduleRender(what){
+  if (!_renderPending){
+    requestAnimationFrame(()=>{
+      const p=_renderPending;
+      _renderPending=0;
+      if (p & RENDER_FIXTURES) renderFixtures();
+      if (p & RENDER_BUTTONS) renderButtons();
+    });
+  }
+  _renderPending |= what;
+}
+
+function cardButton(elm){ return elm.closest('.scene-card')._button; }
+
+// ===== Fixtures =====
+function renderFixtures(){
+  const frag=document.createDocumentFragment();
+  const tpl=el('tpl-fixture');
+  STATE.fixtures.forEach((f,idx)=>{
+    const node=tpl.content.firstElementChild.cloneNode(true);
+    node.dataset.idx=idx;
+    node._fixture=f;
+    node.querySelector('.fx-name').value=f.name||'';
+    node.querySelector('.fx-start').value=f.start_channel||1;
+    node.querySelector('.fx-mode').value=f.mode||'RGBW';
+    node.querySelector('.fx-map').value=(f.map||[]).join(',');
+    frag.appendChild(node);
+  });
+  // alle Karten in einem Schritt einsetzen → ein Layout statt eines pro Karte
+  el('fixtures').replaceChildren(frag);
+}
+function onFixtureInput(e){
+  const t=e.target, f=t.closest('.card')?._fixture;
+  if (!f) return;
+  const cls=t.classList;
+  if (cls.contains('fx-name')){
+    // erst beim Verlassen des Feldes übernehmen: Zwischenstände beim Tippen ("W", "Wa", …)
+    // würden sonst als per-fixture-Schlüssel in allen Szenen landen
+    if (e.type!=='change') return;
+    const old=f.name;
+    f.name=t.value;
+    renameFixtureValues(old, f.name);
+    scheduleRender(RENDER_BUTTONS);
+  }
+  else if (cls.contains('fx-start')) f.start_channel=parseInt(t.value||'1');
+  else if (cls.contains('fx-mode')) f.mode=t.value;
+  else if (cls.contains('fx-map')) f.map=t.value.split(',').map(s=>s.trim()).filter(Boolean);
+}
+
+// Fixture-Liste/-Namen ändern auch die per-fixture-Zeilen der Szenen → beide Listen rendern
+function addFixture(){ STATE.fixtures.push({name:'New', start_channel:1, mode:'RGBW', map:[]}); scheduleRender(RENDER_FIXTURES | RENDER_BUTTONS); changed('fixtures'); }
+function delFixture(btn){
+  const idx=STATE.fixtures.indexOf(btn.closest('.card')._fixture);
+  if (idx>=0){
+    const name=STATE.fixtures[idx].name;
+    STATE.fixtures.splice(idx,1);
+    renameFixtureValues(name, null);
+  }
+  scheduleRender(RENDER_FIXTURES | RENDER_BUTTONS);
+  changed('fixtures');
+}
+
+// per-fixture-Werte aller Szenen und Steps hängen am Fixture-Namen: beim Umbenennen
+// mitnehmen (newName=null: Fixture gelöscht), den alten Schlüssel nur entfernen,
+// wenn kein anderes Fixture mehr so heißt
+function renameFixtureValues(oldName, newName){
+  if (oldName===newName) return;
+  const keep=STATE.fixtures.some(f=>f.name===oldName);
+  const move=m=>{
+    if (!m || !(oldName in m)) return;
+    if (newName!==null && !(newName in m)) m[newName]=m[oldName];
+    if (!keep) delete m[oldName];
+  };
+  STATE.buttons.forEach(b=>{
+    const s=b.scene;
+    if (!s) return;
+    move(s.values);
+    (s.steps||[]).forEach(st=>move(st.values));
+  });
+}
+
+// ===== Scenes / Buttons =====
+function nextFreeIndex(){
+  // bei n Buttons liegt die erste Lücke in 0..n → nur diese Indizes markieren
+  const bs = STATE.buttons || [];
+  const used = new Uint8Array(bs.length + 1);
+  for (const b of bs){
+    const i = parseInt(b.index);
+    if (i >= 0 && i <= bs.length) used[i] = 1;
+  }
+  return used.indexOf(0);
+}
+
+// Szenen-Karten je Button-Objekt: renderButtons() baut nur neue Karten, entfernt
+// gelöschte und ordnet um – bestehende Karten (inkl. Fokus/Eingaben) bleiben erhalten
+let _btnNodes = new Map();
+
+const _io = (typeof IntersectionObserver !== 'undefined')
+  ? new IntersectionObserver(entries=>{
+      for (const e of entries){
+        if (!e.isIntersecting) continue;
+        _io.unobserve(e.target);
+        if (e.target.dataset.pending) renderButtonBody(e.target, e.target._button);
+      }
+    }, {rootMargin:'200px'})
+  : null;
+
+function fixtureKey(){ return STATE.fixtures.map(f=>f.name).join('\u0000'); }
+
+function buildButtonCard(b){
+  const node=el('tpl-button').content.firstElementChild.cloneNode(true);
+  node._button=b;
+
+  node.querySelector('.bt-index-text').textContent = String(b.index);
+  node.querySelector('.bt-label').value=b.label||'';
+  node.querySelector('.uri-text').textContent = `/trigger/${b.index}?fade_ms=2000`;
+
+  node.querySelector('.bt-type').value=b.scene?.type||'static';
+
+  if (_io){
+    // Inhalt (Farbzeilen/Steps) erst bauen, wenn die Karte in die Nähe des Viewports kommt;
+    // die Vorgabewerte gehören aber sofort ins Modell (Speichern/Abspielen sehen sonst Nullen)
+    applySceneDefaults(b.scene);
+    node._fxKey=fixtureKey();
+    node.dataset.pending='1';
+    _io.observe(node);
+  } else {
+    renderButtonBody(node, b);
+  }
+  return node;
+}
+
+function setSceneType(node, t){
+  const b=node._button;
+  if (t==='blackout'){ b.scene={type:'blackout'}; }
+  else if (t==='static'){ b.scene={type:'static', all:{r:255,g:190,b:120,w:0,a:0}}; }
+  else if (t==='per-fixture'){ b.scene={type:'per-fixture', values:{}}; }
+  else if (t==='sequence'){
+    b.scene={ type:'sequence', hold_ms:200, crossfade_ms:400,
+      steps:[ {all:{r:255,g:0,b:0,w:0,a:0}}, {all:{r:0,g:0,b:255,w:0,a:0}} ] };
+  }
+  // nur den Inhalt dieser Karte neu aufbauen, nicht alle Szenen
+  renderButtonBody(node, b);
+}
+
+function renderButtons(){
+  const host=el('buttons');
+
+  const live=new Set(STATE.buttons);
+  _btnNodes.forEach((node,b)=>{
+    if (!live.has(b)){ _io?.unobserve(node); node.remove(); _btnNodes.delete(b); }
+  });
+
+  if (_btnNodes.size===0){
+    // nichts wiederverwendbar (z.B. nach Reload): alles per Fragment in einem Schritt
+    const frag=document.createDocumentFragment();
+    STATE.buttons.forEach((b,idx)=>{
+      const node=buildButtonCard(b);
+      node.dataset.idx=idx;
+      _btnNodes.set(b, node);
+      frag.appendChild(node);
+    });
+    host.replaceChildren(frag);
+    return;
+  }
+
+  // per-fixture-Zeilen hängen an den Fixture-Namen → nur dann neu aufbauen
+  const fxKey=fixtureKey();
+  let cur=host.firstElementChild;
+  STATE.buttons.forEach((b,idx)=>{
+    let node=_btnNodes.get(b);
+    if (!node){
+      node=buildButtonCard(b);
+      _btnNodes.set(b, node);
+    } else if (node._fxKey!==fxKey){
+      if (node.dataset.pending || !usesFixtures(b.scene)){ applySceneDefaults(b.scene); node._fxKey=fxKey; }
+      else renderButtonBody(node, b);
+    }
+    node.dataset.idx=idx;
+    if (node===cur) cur=cur.nextElementSibling;
+    else host.insertBefore(node, cur);
+  });
+}
+
+// Fehlende Farbwerte einer Szene (inkl. per-fixture-Werte für alle aktuellen Fixtures)
+// ergänzen – dasselbe, was das Rendern der Farbzeilen tut, nur ohne DOM
+function usesFixtures(s){
+  if (!s) return false;
+  if (s.type==='per-fixture') return true;
+  return s.type==='sequence' && (s.steps||[]).some(st=>st.values);
+}
+
+function applySceneDefaults(s){
+  if (!s) return;
+  if (s.type==='static'){
+    s.all = s.all || {r:255,g:190,b:120,w:0,a:0};
+  }
+  else if (s.type==='per-fixture'){
+    s.values = s.values || {};
+    STATE.fixtures.forEach(f=>{ s.values[f.name]=s.values[f.name]||{r:0,g:0,b:0,w:0,a:0}; });
+  }
+  else if (s.type==='sequence'){
+    (s.steps||[]).forEach(step=>{
+      if (step.values){
+        STATE.fixtures.forEach(f=>{ step.values[f.name]=step.values[f.name]||{r:0,g:0,b:0,w:0,a:0}; });
+      } else {
+        step.all = step.all || {r:0,g:0,b:0,w:0,a:0};
+      }
+    });
+  }
+}
+
+function renderButtonBody(node, b){
+  delete node.dataset.pending;
+  const frag=document.createDocumentFragment();
+  const s=b.scene||{type:'static'};
+  applySceneDefaults(s);
+
+  if (s.type==='static'){
+    frag.appendChild(colorRow('All', s, 'all'));
+  }
+  else if (s.type==='per-fixture'){
+    STATE.fixtures.forEach(f=>{
+      frag.appendChild(colorRow(f.name, s.values, f.name));
+    });
+  }
+  else if (s.type==='sequence'){
+    const ctrl=TPL_SEQ_CTRL.cloneNode(true);
+    ctrl.querySelector('.hold').value=s.hold_ms??0;
+    ctrl.querySelector('.xf').value=s.crossfade_ms??0;
+    frag.appendChild(ctrl);
+
+    (s.steps||[]).forEach((st, si)=>{
+      frag.appendChild(renderSeqStep(b, s, st, si));
+    });
+  }
+  node.querySelector('.bt-body').replaceChildren(frag);
+  node._fxKey=fixtureKey();
+}
+
+function renderSeqStep(button, scene, step, si){
+  const box=TPL_SEQ_STEP.cloneNode(true);
+  box.querySelector('.s-title').textContent=`Step ${si+1}`;
+  box.querySelector('.s-type').value=step.values ? 'per-fixture' : 'all';
+  box.querySelector('.s-hold').value=step.hold_ms ?? '';
+  box.querySelector('.s-xf').value=step.crossfade_ms ?? '';
+
+  box._step=step;
+  renderStepBody(box);
+  return box;
+}
+
+function renderStepBody(box){
+  const step=box._step;
+  const frag=document.createDocumentFragment();
+  if (step.values){
+    step.values = step.values || {};
+    STATE.fixtures.forEach(f=>{
+      step.values[f.name] = step.values[f.name] || {r:0,g:0,b:0,w:0,a:0};
+      frag.appendChild(colorRow(f.name, step.values, f.name));
+    });
+  } else {
+    step.all = step.all || {r:0,g:0,b:0,w:0,a:0};
+    frag.appendChild(colorRow('All', step, 'all'));
+  }
+  box.querySelector('.step-body').replaceChildren(frag);
+}
+
+function setStepType(box, t){
+  const step=box._step;
+  if (t==='all'){
+    const first = (step.values && Object.values(step.values)[0]) || {r:0,g:0,b:0,w:0,a:0};
+    step.all = step.all || {...first};
+    delete step.values;
+  }else{
+    step.values = step.values || {};
+    if (step.all){
+      STATE.fixtures.forEach(f=>{
+        step.values[f.name] = step.values[f.name] || {...step.all};
+      });
+    }else{
+      STATE.fixtures.forEach(f=>{
+        step.values[f.name] = step.values[f.name] || {r:0,g:0,b:0,w:0,a:0};
+      });
+    }
+    delete step.all;
+  }
+  renderStepBody(box);
+}
+
+function addSeqStep(btnEl){
+  const node=btnEl.closest('.scene-card');
+  const b=node._button;
+  b.scene.steps=b.scene.steps||[];
+  b.scene.steps.push({ all:{r:0,g:0,b:0,w:0,a:0} });
+  renderButtonBody(node, b);
+  changed('buttons');
+}
+
+function delStep(btnEl){
+  const node=btnEl.closest('.scene-card');
+  const b=node._button;
+  const stepIdx=b.scene.steps.indexOf(btnEl.closest('.step-card')._step);
+  if (stepIdx>=0) b.scene.steps.splice(stepIdx,1);
+  renderButtonBody(node, b);
+  changed('buttons');
+}
+
+// ===== Delegierte Handler für die Szenenliste =====
+// ein Listener pro Ereignistyp statt Closures an jedem Eingabefeld;
+// das Ziel (Button, Step, Farbwert) hängt an der jeweiligen Karte bzw. Zeile
+function onButtonsInput(e){
+  const t=e.target, cls=t.classList;
+  const row=t.closest('.color-row');
+  if (row){ onColorInput(row); return; }
+  const card=t.closest('.scene-card');
+  if (!card) return;
+  const s=card._button.scene;
+  if (cls.contains('bt-label')) card._button.label=t.value;
+  else if (cls.contains('hold')) s.hold_ms=parseInt(t.value||'0');
+  else if (cls.contains('xf')) s.crossfade_ms=parseInt(t.value||'0');
+  else if (cls.contains('s-hold') || cls.contains('s-xf')){
+    const step=t.closest('.step-card')._step;
+    const v=(t.value===''? null : parseInt(t.value));
+    if (cls.contains('s-hold')) step.hold_ms=v; else step.crossfade_ms=v;
+  }
+}
+
+function onButtonsChange(e){
+  const t=e.target, cls=t.classList;
+  if (cls.contains('bt-type')) setSceneType(t.closest('.scene-card'), t.value);
+  else if (cls.contains('s-type')) setStepType(t.closest('.step-card'), t.value);
+}
+
+el('fixtures').addEventListener('input', onFixtureInput);
+el('fixtures').addEventListener('change', onFixtureInput);
+el('buttons').addEventListener('input', onButtonsInput);
+el('buttons').addEventListener('change', onButtonsChange);
+
+// ===== State I/O =====
+function applyState(j){
+  STATE=j;
+  _dirty.clear();
+  // einmal beim Laden sortieren; addButton fügt sortiert ein, delButton erhält die Ordnung
+  STATE.buttons=(STATE.buttons||[]).sort((a,b)=>a.index-b.index);
+  el('universe').value=STATE.universe??1;
+  el('def-dimmer').value=STATE.defaults?.dimmer ?? 255;
+  el('def-strobe').value=STATE.defaults?.strobe ?? 0;
+  scheduleRender(RENDER_FIXTURES | RENDER_BUTTONS);
+}
+
+async function reloadState(){
+  const r=await fetch('/api/state'); const j=await r.json();
+  applyState(j);
+  const d=await (await fetch('/api/dim')).json();
+  el('dim-val').textContent=(d.level ?? 100)+'%';
+  el('dim-set').value=d.level ?? 100;
+}
+// Seit Laden/Speichern geänderte Top-Level-Felder von STATE → saveState schickt nur diese
+const STATE_KEYS=['universe','fixtures','defaults','buttons'];
+const _dirty=new Set();
+
+function changed(key){ _dirty.add(key); persistDraft(); }
+
+async function saveState(){
+  STATE.universe=parseInt(el('universe').value||'1');
+  STATE.defaults={dimmer:parseInt(el('def-dimmer').value||'255'), strobe:parseInt(el('def-strobe').value||'0')};
+  // Rendern ergänzt per-fixture-Werte unter neuen Fixture-Namen → Buttons mitschicken
+  if (_dirty.has('fixtures')) _dirty.add('buttons');
+  if (!_dirty.size){ clearDraft(); status('Keine Änderungen'); return; }
+
+  const keys=[..._dirty];
+  _dirty.clear();   // Änderungen während des Requests bleiben für den nächsten Save markiert
+  let resp;
+  if (keys.length===STATE_KEYS.length){
+    resp=await fetch('/api/state',{method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify(STATE)});
+  } else {
+    const patch={};
+    keys.forEach(k=>{ patch[k]=STATE[k]; });
+    resp=await fetch('/api/state/patch',{method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({patch})});
+  }
+  if (resp.ok){ if (!_dirty.size) clearDraft(); }
+  else keys.forEach(k=>_dirty.add(k));
+  status(resp.ok?'Gespeichert':'Fehler beim Speichern');
+}
+
+// ===== Entwurf im localStorage =====
+// Ungespeicherte Änderungen überleben Tab schließen/Neuladen. Geschrieben wird entprellt
+// (500 ms Ruhe), damit JSON.stringify nicht bei jedem Tastendruck über den ganzen State läuft.
+const DRAFT_KEY='dmx.draft';
+
+const persistDraft = debounce(()=>{
+  try {
+    localStorage.setItem(DRAFT_KEY, JSON.stringify({
+      saved_at: Date.now(), state: STATE,
+      universe: el('universe').value, dimmer: el('def-dimmer').value, strobe: el('def-strobe').value,
+    }));
+  } catch (e) { /* Speicher voll/gesperrt: Entwurf ist optional */ }
+}, 500);
+
+function clearDraft(){
+  persistDraft.cancel();
+  try { localStorage.removeItem(DRAFT_KEY); } catch (e) {}
+}
+
+function offerDraft(){
+  let d=null;
+  try { d=JSON.parse(localStorage.getItem(DRAFT_KEY)||'null'); } catch (e) {}
+  if (!d || !d.state) return;
+  const when=new Date(d.saved_at).toLocaleString();
+  if (!confirm(`Ungespeicherte Änderungen vom ${when} wiederherstellen?`)){ clearDraft(); return; }
+  applyState(d.state);
+  el('universe').value=d.universe; el('def-dimmer').value=d.dimmer; el('def-strobe').value=d.strobe;
+  STATE_KEYS.forEach(k=>_dirty.add(k));   // Abweichung zum Server unbekannt → komplett speichern
+  status('Entwurf wiederhergestellt – noch nicht gespeichert');
+}
+
+function reloadFromServer(){ clearDraft(); reloadState(); }
+
+// alle Formular-Eingaben in Fixtures/Szenen/Einstellungen zählen als Änderung
+['input','change'].forEach(type => document.addEventListener(type, e=>{
+  const t=e.target;
+  if (t.closest('#fixtures')) changed('fixtures');
+  else if (t.closest('#buttons')) changed('buttons');
+  else if (t.id==='universe') changed('universe');
+  else if (t.id==='def-dimmer' || t.id==='def-strobe') changed('defaults');
+}));
+
+// ===== Dimmer UI =====
+async function dimStep(delta){
+  const r=await fetch('/api/dim/step?delta='+delta,{method:'POST'}); const text=await r.text();
+  const lvl = parseInt(text);
+  el('dim-val').textContent=lvl+'%'; el('dim-set').value=lvl;
+}
+async function dimSet(){
+  const pct=parseInt(el('dim-set').value||'100');
+  const r=await fetch('/api/dim/set?percent='+pct,{method:'POST'}); const j=await r.json();
+  el('dim-val').textContent=j.level+'%';
+}
+
+async function triggerScene(btnEl){
+  const scene=cardButton(btnEl).scene;
+  await fetch('/api/test_scene', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({ scene, fade_ms:0, duration_ms:3000 })});
+  status('Test Szene abgespielt');
+}
+
+function addButton(){
+  const nextIdx = nextFreeIndex();
+  const bs = STATE.buttons;
+  let lo=0, hi=bs.length;
+  while (lo<hi){ const m=(lo+hi)>>1; if (bs[m].index<nextIdx) lo=m+1; else hi=m; }
+  bs.splice(lo, 0, {index:nextIdx, label:'New Scene', scene:{type:'static', all:{r:255,g:190,b:120,w:0,a:0}}});
+  scheduleRender(RENDER_BUTTONS);
+  changed('buttons');
+}
+function delButton(btn){
+  const idx=STATE.buttons.indexOf(cardButton(btn));
+  if (idx>=0) STATE.buttons.splice(idx,1);
+  scheduleRender(RENDER_BUTTONS);
+  changed('buttons');
+}
+
+reloadState().then(offerDraft);
@@ -0,0 +1,22 @@
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# web_dmx importiert ola.ClientWrapper auf Modulebene; ohne OLA-Bindings (CI, Entwicklerrechner)
+# reicht ein leerer Platzhalter – die Tests hier senden keine DMX-Frames.
+try:
+    import ola.ClientWrapper  # noqa: F401
+except ImportError:
+    ola = types.ModuleType("ola")
+    client_wrapper = types.ModuleType("ola.ClientWrapper")
+
+    class ClientWrapper:
+        def __init__(self):
+            raise RuntimeError("OLA ist in den Tests nicht verfügbar")
+
+    client_wrapper.ClientWrapper = ClientWrapper
+    ola.ClientWrapper = client_wrapper
+    sys.modules["ola"] = ola
+    sys.modules["ola.ClientWrapper"] = client_wrapper
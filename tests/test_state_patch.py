@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import web_dmx
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    cfg = tmp_path / "scenes.json"
+    cfg.write_text(json.dumps({
+        "universe": 1,
+        "fixtures": [{"name": "A", "start_channel": 1, "mode": "RGBW"}],
+        "defaults": {"dimmer": 255, "strobe": 0},
+        "buttons": [{"index": 0, "label": "Rot", "scene": {"type": "static", "all": {"r": 255}}}],
+    }))
+    monkeypatch.setattr(web_dmx, "CFG_PATH", cfg)
+    monkeypatch.setattr(web_dmx, "AUTH_TOKEN", "")
+    monkeypatch.setitem(web_dmx._CFG_CACHE, "data", None)
+    monkeypatch.setitem(web_dmx._CFG_CACHE, "mtime", None)
+    return web_dmx.app.test_client(), cfg
+
+
+def test_patch_replaces_only_given_fields(client):
+    c, cfg = client
+    r = c.post("/api/state/patch", json={"patch": {"universe": 2}})
+    assert r.status_code == 200
+    saved = json.loads(cfg.read_text())
+    assert saved["universe"] == 2
+    assert saved["buttons"][0]["label"] == "Rot"
+
+
+@pytest.mark.parametrize("patch", [
+    {"fixtures": None},
+    {"buttons": {}},
+    {"defaults": []},
+    {"universe": "1"},
+    {"universe": True},
+    {"bogus": 1},
+])
+def test_patch_rejects_wrong_types(client, patch):
+    c, cfg = client
+    before = cfg.read_text()
+    r = c.post("/api/state/patch", json={"patch": patch})
+    assert r.status_code == 400
+    assert cfg.read_text() == before
+
+
+def test_patch_requires_object(client):
+    c, _cfg = client
+    assert c.post("/api/state/patch", json=[1]).status_code == 400
+    assert c.post("/api/state/patch", json={"patch": [1]}).status_code == 400
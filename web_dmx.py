@@ -1,12 +1,31 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json, array, os, time, threading
+import json, array, atexit, gzip, hashlib, os, queue, signal, sys, time, threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from flask import Flask, render_template, abort, request
+from typing import Callable, Dict, List, Tuple, Optional, Sequence
+from flask import Flask, Response, render_template, abort, request
 from ola.ClientWrapper import ClientWrapper
 
+try:  # optional: orjson ist deutlich schneller beim Parsen/Serialisieren
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # optional: Brotli für die vorkomprimierte Admin-Seite (sonst nur gzip)
+    import brotli
+except ImportError:
+    brotli = None
+
+def _json_loads(raw: bytes):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def _json_dumps(obj, pretty: bool = False) -> bytes:
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, indent=2 if pretty else None).encode("utf-8")
+
 # =======================
 # Konfiguration / Pfade
 # =======================
@@ -21,19 +40,101 @@ LOGO_URL = "/static/logo.png"
 # =======================
 # State laden/speichern
 # =======================
-def load_state() -> Dict:
+# Geparster scenes.json-Inhalt (nur bei geänderter mtime neu gelesen) + daraus abgeleitete Daten
+_CFG_CACHE: Dict = {"mtime": None, "data": None, "derived": None, "payload": None, "buttons_view": None}
+_CFG_LOCK = threading.Lock()
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Schreibt erst in eine Temp-Datei, bringt sie per fsync auf den Datenträger und
+    ersetzt dann atomar – ein Absturz/Stromausfall hinterlässt die alte oder die neue
+    Datei, nie eine halbe oder leere."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    # auch den Verzeichniseintrag (die Umbenennung) sichern; nicht überall möglich
     try:
-        data = json.loads(CFG_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        data = {}
+        fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _cfg_mtime() -> Optional[int]:
+    try:
+        return CFG_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+# Top-Level-Felder des States und ihr JSON-Typ (für /api/state/patch)
+_STATE_TYPES: Dict[str, type] = {"universe": int, "fixtures": list, "defaults": dict, "buttons": list}
+
+def _normalize_state(data: Dict) -> Dict:
     data.setdefault("universe", 1)
     data.setdefault("fixtures", [])
     data.setdefault("defaults", {"dimmer": 255, "strobe": 0})
     data.setdefault("buttons", [])
     return data
 
+def load_state() -> Dict:
+    """Liefert den (gecachten) State. Das Dict wird geteilt – nicht verändern."""
+    mtime = _cfg_mtime()
+    with _CFG_LOCK:
+        if _CFG_CACHE["data"] is not None and _CFG_CACHE["mtime"] == mtime:
+            return _CFG_CACHE["data"]
+        try:
+            data = _json_loads(CFG_PATH.read_bytes())
+        except Exception:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        _CFG_CACHE["data"] = _normalize_state(data)
+        _CFG_CACHE["mtime"] = mtime
+        return _CFG_CACHE["data"]
+
 def save_state(state: Dict) -> None:
-    CFG_PATH.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    data = _normalize_state(dict(state))
+    with _CFG_LOCK:
+        # nie eine halbe scenes.json (→ leerer State beim Start), siehe _write_atomic
+        _write_atomic(CFG_PATH, _json_dumps(data, pretty=True))
+        _CFG_CACHE["data"] = data
+        _CFG_CACHE["mtime"] = _cfg_mtime()
+
+def _state_payload() -> Tuple[bytes, str]:
+    """State als fertig serialisierte JSON-Bytes + ETag; nur neu erzeugt, wenn sich der State ändert."""
+    st = load_state()
+    with _CFG_LOCK:
+        cached = _CFG_CACHE["payload"]
+        if cached is not None and cached[0] is st:
+            return cached[1], cached[2]
+    body = _json_dumps(st)
+    etag = hashlib.md5(body).hexdigest()
+    with _CFG_LOCK:
+        _CFG_CACHE["payload"] = (st, body, etag)
+    return body, etag
+
+def _button_view(buttons: List[Dict], fixtures: List[Dict]) -> List[Dict]:
+    """Buttons nach Index sortiert für die Bedienseite; nur neu aufgebaut, wenn sich Buttons oder Fixtures ändern."""
+    with _CFG_LOCK:
+        cached = _CFG_CACHE["buttons_view"]
+        if cached is not None and cached[0] is buttons and cached[1] is fixtures:
+            return cached[2]
+    names = [f.get("name") for f in fixtures]
+    view = []
+    for b in sorted(buttons, key=lambda x: x["index"]):
+        x = dict(b)
+        x.setdefault("scene", {})
+        x["swatch_css"] = scene_swatch_css(x["scene"] or {}, names)
+        view.append(x)
+    with _CFG_LOCK:
+        _CFG_CACHE["buttons_view"] = (buttons, fixtures, view)
+    return view
 
 def load_cfg() -> Tuple[int, List[Dict], List[Dict], Dict[str,int]]:
     st = load_state()
@@ -42,28 +143,63 @@ def load_cfg() -> Tuple[int, List[Dict], List[Dict], Dict[str,int]]:
 def _load_dimmer_from_disk(default: int = 100) -> int:
     try:
         if DIMMER_STATE_PATH.exists():
-            data = json.loads(DIMMER_STATE_PATH.read_text(encoding="utf-8"))
+            data = _json_loads(DIMMER_STATE_PATH.read_bytes())
             return int(data.get("level", default))
     except Exception:
         pass
     return default
 
-def _save_dimmer_to_disk(level: int) -> None:
+# dimmer.json wird entprellt geschrieben: Slider-Bursts ergeben höchstens
+# einen (atomaren) Schreibvorgang pro DIMMER_SAVE_DELAY Sekunden
+DIMMER_SAVE_DELAY = 1.0
+
+_DIMMER_PENDING: Optional[int] = None
+_DIMMER_TIMER: Optional[threading.Timer] = None
+_DIMMER_SAVE_LOCK  = threading.Lock()
+_DIMMER_WRITE_LOCK = threading.Lock()
+
+def _write_dimmer_file(level: int) -> None:
     try:
-        DIMMER_STATE_PATH.write_text(json.dumps({"level": int(level)}), encoding="utf-8")
+        with _DIMMER_WRITE_LOCK:
+            _write_atomic(DIMMER_STATE_PATH, _json_dumps({"level": int(level)}))
     except Exception:
         pass
 
+def _flush_dimmer() -> None:
+    global _DIMMER_PENDING, _DIMMER_TIMER
+    with _DIMMER_SAVE_LOCK:
+        level, _DIMMER_PENDING = _DIMMER_PENDING, None
+        if _DIMMER_TIMER is not None:
+            _DIMMER_TIMER.cancel()
+            _DIMMER_TIMER = None
+    if level is not None:
+        _write_dimmer_file(level)
+
+def _save_dimmer_to_disk(level: int) -> None:
+    global _DIMMER_TIMER, _DIMMER_PENDING
+    with _DIMMER_SAVE_LOCK:
+        _DIMMER_PENDING = int(level)
+        if _DIMMER_TIMER is None:
+            _DIMMER_TIMER = threading.Timer(DIMMER_SAVE_DELAY, _flush_dimmer)
+            _DIMMER_TIMER.daemon = True
+            _DIMMER_TIMER.start()
+
+atexit.register(_flush_dimmer)
+
 # =======================
 # Globaler Zustand
 # =======================
-CURRENT_FRAME: Optional[List[int]] = None
-CURRENT_BASE_FRAME: Optional[List[int]] = None
-FRAME_LOCK = threading.Lock()
+CURRENT_BASE_FRAME: Optional[bytes] = None
 SEND_LOCK  = threading.Lock()
 
-ANIM_THREAD: Optional[threading.Thread] = None
-ANIM_STOP  = threading.Event()
+# Animationen tragen die Generation, mit der sie gestartet wurden;
+# stop_animation() zählt sie hoch und weckt alle wartenden Runner.
+_ANIM_GEN  = 0
+_ANIM_COND = threading.Condition()
+
+_RESEND_Q: "queue.Queue[None]" = queue.Queue(maxsize=1)
+_RESEND_THREAD: Optional[threading.Thread] = None
+_RESEND_LOCK = threading.Lock()
 
 GLOBAL_DIMMER_PERCENT = _load_dimmer_from_disk(100)
 GLOBAL_DIMMER_LOCK = threading.Lock()
@@ -92,173 +228,289 @@ def _fixture_span(f: Dict) -> int:
     else:  # RGB
         return 3
 
-def _apply_global_dimmer(frame: List[int], fixtures: List[Dict]) -> List[int]:
-    """Globaler Dimmer: DIM/A-Kanal setzen, falls vorhanden – sonst RGB(W) skalieren."""
+# =======================
+# Fixture-Plan (einmal pro Config kompiliert)
+# =======================
+_PLAN_ROLES = ("DIM", "R", "G", "B", "W", "A", "STROBE")
+
+@dataclass
+class FixturePlan:
+    name: Optional[str]
+    start0: int                          # 0-basierter Startkanal
+    span: int
+    channels: Tuple[Tuple[int, str], ...]  # (Offset, Rolle) der beschreibbaren Kanäle
+    dim_offsets: Tuple[int, ...]         # DIM/A-Kanäle für den globalen Dimmer
+    scale_count: int                     # sonst: erste N Kanäle skalieren (RGB(W))
+
+def _compile_fixture(f: Dict) -> FixturePlan:
+    m = [x.upper() for x in (f.get("map") or []) if isinstance(x, str)]
+    span = _fixture_span(f)
+    if m:
+        channels = tuple((idx, role) for idx, role in enumerate(m) if role in _PLAN_ROLES)
+    else:
+        # Fallback ohne map: RGB, bei Mode RGBW zusätzlich W
+        roles = ["R", "G", "B"]
+        if str(f.get("mode", "RGBW")).upper() == "RGBW":
+            roles.append("W")
+        channels = tuple(enumerate(roles))
+    # Prüfe auf DIM oder A (Amber als Dimmer-Kanal)
+    dim_offsets = tuple(m.index(ch) for ch in ("DIM", "A") if ch in m)
+    return FixturePlan(
+        name=f.get("name"),
+        start0=f["start_channel"] - 1,
+        span=span,
+        channels=channels,
+        dim_offsets=dim_offsets,
+        scale_count=0 if dim_offsets else min(span, 4),
+    )
+
+def _compile_fixtures(fixtures: List[Dict]) -> List[FixturePlan]:
+    return [_compile_fixture(f) for f in fixtures]
+
+def _fixture_cache(fixtures: List[Dict]) -> Dict:
+    """Abgeleitete Daten (Pläne, gerenderte Frames) zu genau dieser Fixture-Liste.
+    Verfällt automatisch, sobald eine neue Config geladen oder gespeichert wird."""
+    with _CFG_LOCK:
+        d = _CFG_CACHE["derived"]
+        if d is None or d["fixtures"] is not fixtures:
+            d = {"fixtures": fixtures, "frames": {}, "xfades": {}}
+            _CFG_CACHE["derived"] = d
+        return d
+
+def get_fixture_plans(fixtures: List[Dict]) -> List[FixturePlan]:
+    d = _fixture_cache(fixtures)
+    plans = d.get("plans")
+    if plans is None:
+        plans = d["plans"] = _compile_fixtures(fixtures)
+    return plans
+
+def cached_frame_len(fixtures: List[Dict]) -> int:
+    """Frame-Länge (letzter belegter Kanal) aus den kompilierten Plänen, einmal pro Config berechnet."""
+    d = _fixture_cache(fixtures)
+    total = d.get("total_len")
+    if total is None:
+        total = d["total_len"] = max((p.start0 + p.span for p in get_fixture_plans(fixtures)), default=0)
+    return total
+
+def _dimmer_zero_prefix(fixtures: List[Dict]) -> int:
+    """Anzahl führender Kanäle, die der globale Dimmer bei 0% garantiert auf 0 setzt."""
+    d = _fixture_cache(fixtures)
+    prefix = d.get("zero_prefix")
+    if prefix is None:
+        covered = bytearray(cached_frame_len(fixtures))
+        for p in get_fixture_plans(fixtures):
+            for off in list(p.dim_offsets) + list(range(p.scale_count)):
+                if 0 <= p.start0 + off < len(covered):
+                    covered[p.start0 + off] = 1
+        prefix = d["zero_prefix"] = covered.find(0) if 0 in covered else len(covered)
+    return prefix
+
+# Skalierungstabellen je Dimmer-Prozent: _DIM_LUTS[pct][v] == round(v * pct/100)
+_DIM_LUTS: List[bytes] = [bytes(int(round(v * (pct / 100.0))) for v in range(256)) for pct in range(101)]
+
+def _apply_global_dimmer(frame: bytes, fixtures: List[Dict]) -> bytes:
+    """Globaler Dimmer: DIM/A-Kanal setzen, falls vorhanden – sonst RGB(W) skalieren.
+    Bei 100% wird frame unverändert (ohne Kopie) zurückgegeben, sonst genau eine Kopie."""
     pct = get_global_dimmer()
     if pct == 100:
-        return list(frame)
-    out = list(frame)
-    factor = pct / 100.0
-    for f in fixtures:
-        start = f["start_channel"] - 1
-        span  = _fixture_span(f)
-        m = [x.upper() for x in (f.get("map") or []) if isinstance(x, str)]
-        
-        # Prüfe auf DIM oder A (Amber als Dimmer-Kanal)
-        dimmer_channels = [ch for ch in ["DIM", "A"] if ch in m]
-        if dimmer_channels:
-            for dim_ch in dimmer_channels:
-                ch = start + m.index(dim_ch)
-                if 0 <= ch < len(out):
-                    out[ch] = int(round(255 * factor))
-        else:
-            # Skaliere RGB(W)
-            color_channels = min(span, 4)
-            for off in range(color_channels):
-                i = start + off
-                if 0 <= i < len(out):
-                    out[i] = int(round(out[i] * factor))
+        return frame
+    if pct == 0 and len(frame) <= _dimmer_zero_prefix(fixtures):
+        # jeder Kanal ist DIM/A oder skaliert → alles 0, ohne Tabelle/Schleife
+        return bytes(len(frame))
+    out = bytearray(frame)
+    lut = _DIM_LUTS[pct]
+    dim_val = lut[255]
+    n = len(out)
+    for p in get_fixture_plans(fixtures):
+        start = p.start0
+        for off in p.dim_offsets:
+            ch = start + off
+            if 0 <= ch < n:
+                out[ch] = dim_val
+        if p.scale_count:
+            # Skaliere RGB(W) per Lookup-Tabelle (bytes.translate läuft in C)
+            a, b = max(0, start), min(n, start + p.scale_count)
+            if a < b:
+                out[a:b] = out[a:b].translate(lut)
     return out
 
 # =======================
 # Frame Utilities
 # =======================
-def frame_len(fixtures: List[Dict]) -> int:
-    end = 0
-    for f in fixtures:
-        end = max(end, f["start_channel"] + _fixture_span(f) - 1)
-    return end
-
-def ensure_len(buf: Optional[List[int]], n: int) -> List[int]:
-    if buf is None: return [0]*n
-    if len(buf) < n: return buf + [0]*(n - len(buf))
-    if len(buf) > n: return buf[:n]
+def ensure_len(buf: Optional[bytes], n: int) -> bytes:
+    if buf is None: return bytes(n)
+    if len(buf) < n: return bytes(buf) + bytes(n - len(buf))
+    if len(buf) > n: return bytes(buf[:n])
     return buf
 
-def get_current_frame(target_len: int) -> List[int]:
-    global CURRENT_FRAME
-    with FRAME_LOCK:
-        return ensure_len(CURRENT_FRAME, target_len)
-
-def set_current_frame(frame: List[int]) -> None:
-    global CURRENT_FRAME
-    with FRAME_LOCK:
-        CURRENT_FRAME = list(frame)
+# Frames sind unveränderlich, sobald sie veröffentlicht sind: Schreiber tauschen nur
+# die Referenz aus (unter dem GIL atomar), Leser holen sie einmal – kein Lock nötig.
+def get_base_frame(target_len: int) -> bytes:
+    return ensure_len(CURRENT_BASE_FRAME, target_len)
 
-def get_base_frame(target_len: int) -> List[int]:
+def set_base_frame(frame: bytes) -> None:
+    """Speichert eine Referenz – der Aufrufer darf frame danach nicht mehr verändern."""
     global CURRENT_BASE_FRAME
-    with FRAME_LOCK:
-        return ensure_len(CURRENT_BASE_FRAME, target_len)
+    CURRENT_BASE_FRAME = frame
 
-def set_base_frame(frame: List[int]) -> None:
-    global CURRENT_BASE_FRAME
-    with FRAME_LOCK:
-        CURRENT_BASE_FRAME = list(frame)
-
-def _resend_current_frame():
+def _resend_now():
     try:
         universe, fixtures, _buttons, _defaults = load_cfg()
-        base = get_base_frame(frame_len(fixtures))
         with SEND_LOCK:
-            send_dmx(universe, base)
+            base = get_base_frame(cached_frame_len(fixtures))
+            send_dmx(universe, base, fixtures)
     except Exception:
         pass
 
+def _resend_worker():
+    while True:
+        _RESEND_Q.get()
+        _resend_now()
+
+def _post_frame(frame: bytes) -> None:
+    """Setzt frame als neuen Base-Frame und überlässt das Senden dem dmx-resend-Worker;
+    der HTTP-Thread wartet nicht auf OLA. SEND_LOCK sorgt dafür, dass ein gerade
+    laufender Animations-Send danach nicht noch seinen alten Frame als Base hinterlässt."""
+    with SEND_LOCK:
+        set_base_frame(frame)
+    _resend_current_frame()
+
+def _resend_current_frame():
+    """Fordert ein erneutes Senden des Base-Frames an, ohne auf OLA zu warten.
+    Anfragen während eines laufenden Sends verschmelzen; der Worker liest Dimmer
+    und Base-Frame erst beim Senden, schickt also immer den neuesten Stand."""
+    global _RESEND_THREAD
+    with _RESEND_LOCK:
+        if _RESEND_THREAD is None:
+            _RESEND_THREAD = threading.Thread(target=_resend_worker, name="dmx-resend", daemon=True)
+            _RESEND_THREAD.start()
+    try:
+        _RESEND_Q.put_nowait(None)
+    except queue.Full:
+        pass
+
 # =======================
 # DMX Frame Builder (mit A-Kanal Support)
 # =======================
-def _apply_fixture(buf: List[int], f: Dict, color: Dict[str,int], attrs: Dict[str,int], root_defaults: Dict[str,int]):
-    """Schreibt Werte eines Fixtures gemäß 'map' oder fallback (RGB/RGBW)."""
-    start = f["start_channel"] - 1
-    m = [x.upper() for x in (f.get("map") or []) if isinstance(x, str)]
-    dim_def = int(root_defaults.get("dimmer", 255))
-    stro_def= int(root_defaults.get("strobe", 0))
-
-    dim = int(attrs.get("dimmer", dim_def))
-    stro= int(attrs.get("strobe", stro_def))
-    r = int(color.get("r",0))
-    g = int(color.get("g",0))
-    b = int(color.get("b",0))
-    w = int(color.get("w",0))
-    a = int(color.get("a",0))  # NEU: Amber-Kanal
-
-    if not m:
-        # Fallback ohne map
-        if start+0 < len(buf): buf[start+0] = r
-        if start+1 < len(buf): buf[start+1] = g
-        if start+2 < len(buf): buf[start+2] = b
-        if str(f.get("mode","RGBW")).upper()=="RGBW" and start+3 < len(buf):
-            buf[start+3] = w
-        return
-
-    for idx, role in enumerate(m):
+_NO_ATTRS: Dict[str,int] = {}
+
+def _clamp8(v) -> int:
+    v = int(v)
+    return v if 0 <= v <= 255 else (0 if v < 0 else 255)
+
+def _role_values(color: Dict[str,int], gattrs: Dict[str,int], overrides: Dict[str,int],
+                 dim_def: int, stro_def: int) -> Dict[str,int]:
+    """Rolle → fertig geklemmter DMX-Wert.
+    Attribute: overrides (per Fixture) vor gattrs (Szene) vor Defaults – ohne Merge-Dict."""
+    return {
+        "DIM":    _clamp8(overrides.get("dimmer", gattrs.get("dimmer", dim_def))),
+        "R":      _clamp8(color.get("r",0)),
+        "G":      _clamp8(color.get("g",0)),
+        "B":      _clamp8(color.get("b",0)),
+        "W":      _clamp8(color.get("w",0)),
+        "A":      _clamp8(color.get("a",0)),  # Amber-Kanal
+        "STROBE": _clamp8(overrides.get("strobe", gattrs.get("strobe", stro_def))),
+    }
+
+def _apply_fixture(buf: bytearray, plan: FixturePlan, vals: Dict[str,int]):
+    """Schreibt die Rollenwerte eines Fixtures gemäß kompiliertem Plan ('map' oder fallback RGB/RGBW)."""
+    start = plan.start0
+    n = len(buf)
+    for idx, role in plan.channels:
         ch = start + idx
-        if ch >= len(buf): break
-        if role == "DIM":      buf[ch] = max(0, min(255, dim))
-        elif role == "R":      buf[ch] = max(0, min(255, r))
-        elif role == "G":      buf[ch] = max(0, min(255, g))
-        elif role == "B":      buf[ch] = max(0, min(255, b))
-        elif role == "W":      buf[ch] = max(0, min(255, w))
-        elif role == "A":      buf[ch] = max(0, min(255, a))  # NEU: Amber
-        elif role == "STROBE": buf[ch] = max(0, min(255, stro))
-
-def build_dmx_frame(fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int]) -> List[int]:
-    dmx = [0] * frame_len(fixtures)
+        if ch >= n: break
+        buf[ch] = vals[role]
+
+def build_dmx_frame(fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int]) -> bytearray:
+    dmx = bytearray(cached_frame_len(fixtures))
     t = (scene.get("type") or "static").lower()
     if t == "blackout":
         return dmx
 
     gattrs = scene.get("attrs", {})
     pfattrs= (scene.get("per_fixture_attrs") or {})
+    dim_def = int(root_defaults.get("dimmer", 255))
+    stro_def= int(root_defaults.get("strobe", 0))
+    plans = get_fixture_plans(fixtures)
 
     if t == "static":
         allc = scene.get("all", {})
-        for f in fixtures:
-            _apply_fixture(dmx, f, allc, {**gattrs, **pfattrs.get(f["name"], {})}, root_defaults)
+        # Werte einmal pro Szene klemmen; nur Fixtures mit eigenen Attributen brauchen eigene Werte
+        shared = _role_values(allc, gattrs, _NO_ATTRS, dim_def, stro_def)
+        for p in plans:
+            ov = pfattrs.get(p.name)
+            vals = _role_values(allc, gattrs, ov, dim_def, stro_def) if ov else shared
+            _apply_fixture(dmx, p, vals)
         return dmx
 
     if t == "per-fixture":
         vals = scene.get("values", {})
-        for f in fixtures:
-            col = vals.get(f["name"], {})
-            _apply_fixture(dmx, f, col, {**gattrs, **pfattrs.get(f["name"], {})}, root_defaults)
+        for p in plans:
+            col = vals.get(p.name, {})
+            _apply_fixture(dmx, p, _role_values(col, gattrs, pfattrs.get(p.name, _NO_ATTRS), dim_def, stro_def))
         return dmx
 
     return dmx
 
-def preview_rgb(scene: Dict) -> Tuple[int,int,int]:
-    t = (scene.get("type") or "static").lower()
+# ---- Kachel-Vorschau der Bedienseite (gleiche Logik wie StreamDeck-Generator) ----
+_SWATCH_GLOSS = ("linear-gradient(180deg, rgba(255,255,255,0.25) 0%, "
+                 "rgba(255,255,255,0.05) 60%, rgba(0,0,0,0.12) 100%)")
+
+def _swatch_colors(scene: Dict, names: Sequence[str]) -> List[Tuple[int,int,int]]:
+    def rgb(c: Dict) -> Tuple[int,int,int]:
+        try:
+            return (_clamp8(c.get("r") or 0), _clamp8(c.get("g") or 0), _clamp8(c.get("b") or 0))
+        except (AttributeError, TypeError, ValueError):
+            return (0, 0, 0)
+    def per_fixture(values) -> List[Tuple[int,int,int]]:
+        # nur Werte aktueller Fixtures – verwaiste Schlüssel (umbenannt/gelöscht) spielt build_dmx_frame nicht ab
+        if not isinstance(values, dict):
+            return []
+        return [rgb(values[n]) for n in names if n in values]
+    if not isinstance(scene, dict):
+        return [(0, 0, 0)]
+    t = str(scene.get("type") or "blackout").lower()
     cols = []
-    if t == "blackout": return (0,0,0)
     if t == "static":
-        c = scene.get("all", {})
-        cols.append((c.get("r",0), c.get("g",0), c.get("b",0)))
+        cols.append(rgb(scene.get("all") or {}))
     elif t == "per-fixture":
-        for c in (scene.get("values", {}) or {}).values():
-            cols.append((c.get("r",0), c.get("g",0), c.get("b",0)))
+        cols.extend(per_fixture(scene.get("values")))
     elif t == "sequence":
-        steps = scene.get("steps", [])
-        if steps:
-            c = (steps[0].get("all") or {})
-            if c:
-                cols.append((c.get("r",0), c.get("g",0), c.get("b",0)))
+        steps = scene.get("steps")
+        for st in (steps if isinstance(steps, list) else []):
+            if not isinstance(st, dict):
+                continue
+            if st.get("all") is not None:
+                cols.append(rgb(st["all"]))
             else:
-                vals = (steps[0].get("values") or {})
-                if vals:
-                    first = next(iter(vals.values()))
-                    cols.append((first.get("r",0), first.get("g",0), first.get("b",0)))
-    if not cols: return (0,0,0)
+                cols.extend(per_fixture(st.get("values")))
+    return cols or [(0, 0, 0)]
+
+def scene_swatch_css(scene: Dict, names: Sequence[str]) -> str:
+    """CSS-background für die Szenen-Kachel: 1 Farbe voll, 2 halbiert, 3-4 als 2x2-Raster,
+    mehr als vertikaler Verlauf – jeweils mit leichtem Glanz darüber."""
+    cols = ["rgb(%d,%d,%d)" % c for c in _swatch_colors(scene, names)]
     n = len(cols)
-    return (sum(r for r,_,_ in cols)//n,
-            sum(g for _,g,_ in cols)//n,
-            sum(b for *_,b in cols)//n)
+    if n == 1:
+        layers = ["linear-gradient(%s,%s)" % (cols[0], cols[0])]
+    elif n == 2:
+        layers = ["linear-gradient(90deg, %s 0 50%%, %s 50%% 100%%)" % (cols[0], cols[1])]
+    elif n <= 4:
+        pos = ("0 0", "100% 0", "0 100%", "100% 100%")
+        layers = ["linear-gradient(%s,%s) %s/50%% 50%% no-repeat" % (c, c, pos[i]) for i, c in enumerate(cols)]
+    else:
+        stops = ", ".join("%s %g%%" % (c, round(100 * i / (n - 1), 2)) for i, c in enumerate(cols))
+        layers = ["linear-gradient(180deg, %s)" % stops]
+    return ", ".join([_SWATCH_GLOSS] + layers + ["#eee"])
 
 # =======================
 # Sequenzen
 # =======================
-def build_sequence_frames(fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int]):
+def build_sequence_frames(fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int]) -> Tuple[Tuple[bytes, int, int], ...]:
+    """Alle Schritte als (Frame, hold_ms, crossfade_ms); jeder Frame hat genau cached_frame_len() Bytes."""
     default_hold = int(scene.get("hold_ms", 0))
     default_xf   = int(scene.get("crossfade_ms", 0))
+    blank = bytes(cached_frame_len(fixtures))
     frames = []
     for st in (scene.get("steps") or []):
         hold = int(st.get("hold_ms", default_hold))
@@ -268,43 +520,110 @@ def build_sequence_frames(fixtures: List[Dict], scene: Dict, root_defaults: Dict
         elif "values" in st:
             frame = build_dmx_frame(fixtures, {"type":"per-fixture","values":st["values"]}, root_defaults)
         else:
-            frame = [0] * frame_len(fixtures)
-        frames.append((frame, hold, xfad))
-    return frames
-
-def run_sequence(universe: int, fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int]):
-    seq = build_sequence_frames(fixtures, scene, root_defaults)
+            frame = blank
+        frames.append((bytes(frame), hold, xfad))
+    return tuple(frames)
+
+# Gerenderte Szenen je Config (Schlüssel: Szene + Defaults als kanonisches JSON)
+FRAME_CACHE_SIZE = 64
+# Crossfades getrennt und knapper: ein Eintrag hält bis zu 150 volle Frames und soll
+# die billigen Szenen-Frames nicht verdrängen; 16 reichen für die Übergänge einer Sequenz
+XFADE_CACHE_SIZE = 16
+
+_FRAME_CACHE_LOCK = threading.Lock()
+
+def _memo(fixtures: List[Dict], key: Tuple, build, store: str = "frames", size: int = FRAME_CACHE_SIZE):
+    cache = _fixture_cache(fixtures)[store]
+    with _FRAME_CACHE_LOCK:
+        hit = cache.get(key)
+    if hit is None:
+        # außerhalb des Locks bauen; zwei gleichzeitige Misses bauen doppelt, liefern aber dasselbe
+        hit = build()
+        with _FRAME_CACHE_LOCK:
+            while len(cache) >= size:
+                cache.pop(next(iter(cache)))
+            cache[key] = hit
+    return hit
+
+def _memo_frames(kind: str, fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int], build):
+    try:
+        key = (kind, json.dumps(scene, sort_keys=True), json.dumps(root_defaults, sort_keys=True))
+    except (TypeError, ValueError):
+        return build(fixtures, scene, root_defaults)
+    return _memo(fixtures, key, lambda: build(fixtures, scene, root_defaults))
+
+def cached_dmx_frame(fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int]) -> bytes:
+    """Wie build_dmx_frame, aber memoisiert; liefert unveränderliche bytes."""
+    return _memo_frames("frame", fixtures, scene, root_defaults,
+                        lambda fx, sc, d: bytes(build_dmx_frame(fx, sc, d)))
+
+def cached_sequence_frames(fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int]):
+    """Wie build_sequence_frames, aber memoisiert."""
+    return _memo_frames("sequence", fixtures, scene, root_defaults, build_sequence_frames)
+
+def build_crossfade_frames(start: bytes, target: bytes, steps: int) -> Tuple[bytes, ...]:
+    """Alle Zwischenframes 1..steps eines Crossfades start→target (der letzte ist target)."""
+    buf, changing = _fade_plan(start, target)
+    return tuple(_mix_frame(buf, changing, i, steps) for i in range(1, steps + 1))
+
+def cached_crossfade_frames(fixtures: List[Dict], start: bytes, target: bytes, steps: int) -> Tuple[bytes, ...]:
+    """Wie build_crossfade_frames, aber memoisiert – Sequenzen wiederholen dieselben Übergänge."""
+    return _memo(fixtures, (start, target, steps),
+                 lambda: build_crossfade_frames(start, target, steps), "xfades", XFADE_CACHE_SIZE)
+
+def run_sequence(universe: int, fixtures: List[Dict], scene: Dict, root_defaults: Dict[str,int], gen: int):
+    seq = cached_sequence_frames(fixtures, scene, root_defaults)
     if not seq: return
-    L = max(len(f) for f,_,_ in seq)
-    seq = [(ensure_len(f, L), hold, xf) for (f, hold, xf) in seq]
 
-    with SEND_LOCK:
-        send_dmx(universe, seq[0][0])
+    if not _anim_send(gen, universe, seq[0][0], fixtures):
+        return
 
     idx = 0
-    while not ANIM_STOP.is_set():
+    while not _anim_stopped(gen):
         cur_f, cur_hold, _cur_xf = seq[idx]
-        if cur_hold > 0 and ANIM_STOP.wait(cur_hold/1000):
+        if cur_hold > 0 and _anim_wait(gen, cur_hold/1000):
             break
         nxt = (idx + 1) % len(seq)
         nxt_f, _hold_nxt, xf = seq[nxt]
         xf = int(xf or 0)
         if xf > 0:
             steps = calculate_fade_steps(xf)
-            delay = xf / 1000 / steps
             start = get_base_frame(len(nxt_f))
-            for i in range(1, steps+1):
-                if ANIM_STOP.is_set(): break
-                t = i / steps
-                mix = [int(a + (b - a) * t) for a, b in zip(start, nxt_f)]
-                with SEND_LOCK:
-                    send_dmx(universe, mix)
-                if ANIM_STOP.wait(delay): break
-        else:
-            with SEND_LOCK:
-                send_dmx(universe, nxt_f)
+            fade = cached_crossfade_frames(fixtures, start, nxt_f, steps)
+            if not _play_fade(gen, universe, fixtures, lambda i: fade[i - 1], steps, xf):
+                return
+        elif not _anim_send(gen, universe, nxt_f, fixtures):
+            return
         idx = nxt
 
+def _play_fade(gen: int, universe: int, fixtures: List[Dict], frame_at: Callable[[int], bytes],
+               steps: int, fade_ms: int) -> bool:
+    """Spielt die Fade-Frames frame_at(1..steps) über fade_ms ab – gemeinsamer Pfad aller Fades.
+    Absolute Deadlines (Send-Dauer verlängert den Fade nicht); Zwischenframes werden nur
+    erzeugt/gesendet, wenn OLA frei ist. False, sobald die Animation gen gestoppt wurde."""
+    step_s = fade_ms / 1000 / steps
+    t0 = time.perf_counter()
+    for i in range(1, steps + 1):
+        if i == steps or _dmx_slot_free():
+            if not _anim_send(gen, universe, frame_at(i), fixtures):
+                return False
+        remaining = t0 + step_s * i - time.perf_counter()
+        if remaining > 0 and _anim_wait(gen, remaining):
+            return False
+    return True
+
+def _fade_runner(universe: int, fixtures: List[Dict], start: Sequence[int], target: Sequence[int],
+                 fade_ms: int, gen: int, then_sequence: Optional[Tuple[Dict, Dict[str,int]]] = None):
+    """Fade start→target (abbrechbar über stop_animation()); mit
+    then_sequence=(scene, defaults) läuft danach die Sequenz weiter."""
+    buf, changing = _fade_plan(start, target)
+    steps = calculate_fade_steps(fade_ms)
+    if not _play_fade(gen, universe, fixtures, lambda i: _mix_frame(buf, changing, i, steps), steps, fade_ms):
+        return
+    if then_sequence is not None:
+        scene, root_defaults = then_sequence
+        run_sequence(universe, fixtures, scene, root_defaults, gen)
+
 # =======================
 # OPTIMIERTE FADE STEPS
 # =======================
@@ -337,41 +656,204 @@ def calculate_fade_steps(fade_ms: int) -> int:
         # Sehr lange Fades: 80-150 Steps
         return max(80, min(150, fade_ms // 60))
 
+# =======================
+# Fade-Interpolation (Integer)
+# =======================
+def _fade_plan(start: Sequence[int], target: Sequence[int]) -> Tuple[bytearray, List[Tuple[int, int, int]]]:
+    """Einmal pro Fade: Arbeitspuffer (= start) und nur die Kanäle, die sich ändern,
+    als (Index, Startwert, Delta). Konstante Kanäle kosten pro Schritt nichts."""
+    buf = bytearray(start)
+    changing = [(k, a, b - a) for k, (a, b) in enumerate(zip(start, target)) if a != b]
+    return buf, changing
+
+def _mix_frame(buf: bytearray, changing: List[Tuple[int, int, int]], i: int, steps: int) -> bytes:
+    """Zwischenframe für Schritt i von steps – reine Integer-Arithmetik, kein Float/round."""
+    for k, a, d in changing:
+        buf[k] = a + d * i // steps
+    return bytes(buf)
+
+# =======================
+# OLA Client (persistent)
+# =======================
+OLA_SEND_TIMEOUT = 1.0
+DMX_MAX_FPS = 44  # DMX512: max. ~44 volle Frames pro Sekunde
+
+_LAST_SEND_MONOTONIC = 0.0
+# wiederverwendeter Sendepuffer für SendDmx; nur unter SEND_LOCK benutzen
+_DMX_BUF = array.array('B', bytes(512))
+
+_OLA_WRAPPER: Optional[ClientWrapper] = None
+_OLA_CLIENT = None
+_OLA_LOCK = threading.Lock()
+
+def _get_ola():
+    """Ein ClientWrapper für alle Frames; seine Eventloop läuft dauerhaft in einem Daemon-Thread."""
+    global _OLA_WRAPPER, _OLA_CLIENT
+    with _OLA_LOCK:
+        if _OLA_WRAPPER is None:
+            started: Dict = {}
+            ready = threading.Event()
+            threading.Thread(target=_run_ola, args=(started, ready), name="ola-client", daemon=True).start()
+            ready.wait()
+            if "error" in started:
+                raise started["error"]
+            _OLA_WRAPPER = started["wrapper"]
+            _OLA_CLIENT = _OLA_WRAPPER.Client()
+        return _OLA_WRAPPER, _OLA_CLIENT
+
+def _run_ola(started: Dict, ready: threading.Event) -> None:
+    # der SelectServer gehört dem Thread, der ihn anlegt → Wrapper hier erzeugen, nicht im Aufrufer
+    try:
+        wrapper = ClientWrapper()
+    except Exception as e:  # z.B. olad läuft nicht
+        started["error"] = e
+        ready.set()
+        return
+    started["wrapper"] = wrapper
+    ready.set()
+    try:
+        wrapper.Run()
+    finally:
+        # Socket erst schließen, wenn die Eventloop beendet ist (sie selektiert darauf);
+        # sonst bleibt nach jedem _reset_ola() ein Dateideskriptor offen
+        try:
+            wrapper.Client().GetSocket().close()
+        except Exception:
+            pass
+
+def _ola_execute(wrapper: ClientWrapper, f: Callable[[], None]) -> None:
+    """Führt f im Thread der OLA-Eventloop aus. Ältere ola-Pakete haben kein
+    ClientWrapper.Execute; ihr SelectServer bietet es aber thread-sicher an."""
+    execute = getattr(wrapper, "Execute", None)
+    if execute is None:
+        execute = wrapper._ss.Execute
+    execute(f)
+
+def _dmx_slot_free() -> bool:
+    """True, wenn seit dem letzten Send ein DMX-Frame-Intervall vergangen ist.
+    Fade-Schleifen überspringen sonst Zwischenschritte (der letzte wird immer gesendet)."""
+    return time.monotonic() - _LAST_SEND_MONOTONIC >= 1.0 / DMX_MAX_FPS
+
+def _reset_ola():
+    """Verwirft den Client (z.B. olad neu gestartet); der nächste Send verbindet neu.
+    Stop() ist thread-sicher; den Socket schließt _run_ola, sobald die Eventloop endet."""
+    global _OLA_WRAPPER, _OLA_CLIENT
+    with _OLA_LOCK:
+        if _OLA_WRAPPER is not None:
+            try:
+                _OLA_WRAPPER.Stop()
+            except Exception:
+                pass
+        _OLA_WRAPPER = None
+        _OLA_CLIENT = None
+
 # =======================
 # Senden (Base + Dimmer)
 # =======================
-def send_dmx(universe: int, dmx: List[int]) -> None:
-    set_base_frame(dmx)
+def send_dmx(universe: int, dmx: Sequence[int], fixtures: Optional[List[Dict]] = None) -> None:
+    """Sendet einen Frame (Aufrufer hält SEND_LOCK, da _DMX_BUF geteilt wird)."""
+    global _LAST_SEND_MONOTONIC, _DMX_BUF
+    base = bytes(dmx)  # keine Kopie, wenn dmx schon bytes ist (Cache-/Fade-Frames)
+    set_base_frame(base)
 
     try:
-        _, fixtures, _, _defaults = load_cfg()
-        to_send = _apply_global_dimmer(list(dmx), fixtures)
+        if fixtures is None:
+            _, fixtures, _, _defaults = load_cfg()
+        to_send = _apply_global_dimmer(base, fixtures)
     except Exception:
-        to_send = list(dmx)
-
-    data = array.array('B', to_send)
-    wrapper = ClientWrapper()
-    client = wrapper.Client()
-    client.SendDmx(universe, data, lambda status: wrapper.Stop())
-    wrapper.Run()
+        to_send = base
 
-    set_current_frame(to_send)
+    if len(_DMX_BUF) == len(to_send):
+        memoryview(_DMX_BUF)[:] = to_send
+    else:
+        # nur bei geänderter Frame-Länge (Fixture-Konfiguration) neu anlegen
+        _DMX_BUF = array.array('B', to_send)
+    data = _DMX_BUF
+    wrapper, client = _get_ola()
+    done = threading.Event()
+    failed = []
+
+    def sent(status):
+        if not status.Succeeded():
+            failed.append(status)
+        done.set()
+
+    def submit():
+        try:
+            client.SendDmx(universe, data, sent)
+        except Exception as e:  # z.B. olad beendet/neu gestartet → Socket tot
+            failed.append(e)
+            done.set()
+
+    # SendDmx muss im Thread der OLA-Eventloop laufen
+    _ola_execute(wrapper, submit)
+    if not done.wait(OLA_SEND_TIMEOUT) or failed:
+        # Timeout oder Fehler: Client verwerfen, der nächste Send verbindet neu
+        _reset_ola()
+    _LAST_SEND_MONOTONIC = time.monotonic()
 
 # =======================
 # Animation Control
 # =======================
-def stop_animation():
-    global ANIM_THREAD
-    if ANIM_THREAD and ANIM_THREAD.is_alive():
-        ANIM_STOP.set()
-        ANIM_THREAD.join(timeout=2)
-    ANIM_STOP.clear()
-    ANIM_THREAD = None
+def stop_animation(only_gen: Optional[int] = None) -> int:
+    """Stoppt die laufende Animation und liefert die neue Generation für die nächste.
+    Mit only_gen wird nur gestoppt, wenn noch genau diese Generation läuft."""
+    global _ANIM_GEN
+    with _ANIM_COND:
+        if only_gen is None or _ANIM_GEN == only_gen:
+            _ANIM_GEN += 1
+            _ANIM_COND.notify_all()
+        return _ANIM_GEN
+
+def _anim_stopped(gen: int) -> bool:
+    return _ANIM_GEN != gen
+
+def _anim_wait(gen: int, timeout: float) -> bool:
+    """Wartet bis zu timeout Sekunden; True, sobald die Animation gen gestoppt wurde."""
+    with _ANIM_COND:
+        return _ANIM_COND.wait_for(lambda: _ANIM_GEN != gen, timeout)
+
+def _anim_send(gen: int, universe: int, frame: Sequence[int], fixtures: List[Dict]) -> bool:
+    """Sendet nur, solange die Animation gen aktiv ist. Die Prüfung unter SEND_LOCK
+    verhindert, dass ein gestoppter Runner nach dem neuen Frame noch einen alten schickt."""
+    with SEND_LOCK:
+        if _ANIM_GEN != gen:
+            return False
+        send_dmx(universe, frame, fixtures)
+        return True
 
 # =======================
 # Flask App
 # =======================
-app = Flask(__name__)
+class _App(Flask):
+    def get_send_file_max_age(self, filename: Optional[str]) -> Optional[int]:
+        # versionierte Assets (?v=<hash>) ändern nie ihren Inhalt → lange cachen
+        if request.args.get("v"):
+            return 365 * 24 * 3600
+        return super().get_send_file_max_age(filename)
+
+    def send_static_file(self, filename: str) -> Response:
+        resp = super().send_static_file(filename)
+        if request.args.get("v"):
+            # Browser sollen versionierte Assets auch beim Reload nicht revalidieren
+            resp.cache_control.immutable = True
+        return resp
+
+app = _App(__name__)
+
+if orjson:
+    from flask.json.provider import DefaultJSONProvider
+
+    class _OrjsonProvider(DefaultJSONProvider):
+        """JSON-Antworten und request.get_json() über orjson statt stdlib json."""
+        def dumps(self, obj, **kwargs) -> str:
+            opt = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+            return orjson.dumps(obj, default=self.default, option=opt).decode("utf-8")
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _OrjsonProvider(app)
 
 def check_token():
     if not AUTH_TOKEN: return True
@@ -382,17 +864,12 @@ def check_token():
 def index():
     if not check_token(): abort(401)
     universe, fixtures, buttons, _defs = load_cfg()
-    btns = []
-    for b in sorted(buttons, key=lambda x: x["index"]):
-        x = dict(b)
-        x.setdefault("scene", {})
-        btns.append(x)
-    return render_template('control.html', universe=universe, fixtures=fixtures, buttons=btns, token=AUTH_TOKEN, logo_url=LOGO_URL)
+    return render_template('control.html', universe=universe, fixtures=fixtures, buttons=_button_view(buttons, fixtures),
+                           token=AUTH_TOKEN, logo_url=LOGO_URL)
 
 # --- Trigger / Blackout ---
 @app.post("/trigger/<int:index>")
 def trigger(index: int):
-    global ANIM_THREAD
     if not check_token(): abort(401)
     fade_ms = int(request.args.get("fade_ms", "0"))
     universe, fixtures, buttons, defs = load_cfg()
@@ -400,42 +877,28 @@ def trigger(index: int):
     if not b: abort(404, "Button nicht definiert")
     scene = b.get("scene", {"type":"blackout"})
 
-    stop_animation()
+    gen = stop_animation()
 
     if (scene.get("type") or "").lower() == "sequence":
-        if fade_ms > 0:
-            seq_frames = build_sequence_frames(fixtures, scene, defs)
-            if seq_frames:
-                target = seq_frames[0][0]
-                start = get_base_frame(len(target))
-                steps = calculate_fade_steps(fade_ms)
-                delay = fade_ms / 1000 / steps
-                with SEND_LOCK:
-                    for i in range(1, steps + 1):
-                        t = i / steps
-                        mix = [int(a + (b - a) * t) for a, b in zip(start, target)]
-                        send_dmx(universe, mix)
-                        time.sleep(delay)
-
-        ANIM_THREAD = threading.Thread(target=run_sequence, args=(universe, fixtures, scene, defs), daemon=True)
-        ANIM_THREAD.start()
+        seq_frames = cached_sequence_frames(fixtures, scene, defs) if fade_ms > 0 else None
+        if seq_frames:
+            target = seq_frames[0][0]
+            start = get_base_frame(len(target))
+            anim = threading.Thread(target=_fade_runner,
+                                    args=(universe, fixtures, start, target, fade_ms, gen, (scene, defs)),
+                                    daemon=True)
+        else:
+            anim = threading.Thread(target=run_sequence, args=(universe, fixtures, scene, defs, gen), daemon=True)
+        anim.start()
         return ("", 204)
 
-    target = build_dmx_frame(fixtures, scene, defs)
+    target = cached_dmx_frame(fixtures, scene, defs)
     if fade_ms <= 0:
-        with SEND_LOCK:
-            send_dmx(universe, target)
+        _post_frame(target)
         return ("", 204)
 
     start = get_base_frame(len(target))
-    steps = calculate_fade_steps(fade_ms)
-    delay = fade_ms / 1000 / steps
-    with SEND_LOCK:
-        for i in range(1, steps + 1):
-            t = i / steps
-            mix = [int(a + (b - a) * t) for a, b in zip(start, target)]
-            send_dmx(universe, mix)
-            time.sleep(delay)
+    threading.Thread(target=_fade_runner, args=(universe, fixtures, start, target, fade_ms, gen), daemon=True).start()
     return ("", 204)
 
 @app.post("/blackout")
@@ -443,8 +906,7 @@ def blackout():
     if not check_token(): abort(401)
     stop_animation()
     universe, fixtures, _buttons, _defs = load_cfg()
-    with SEND_LOCK:
-        send_dmx(universe, [0]*frame_len(fixtures))
+    _post_frame(bytes(cached_frame_len(fixtures)))
     return ("", 204)
 
 # --- API: Global Dimmer ---
@@ -474,7 +936,11 @@ def api_dim_get():
 @app.get("/api/state")
 def api_state_get():
     if not check_token(): abort(401)
-    return load_state()
+    body, etag = _state_payload()
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
 
 @app.post("/api/state")
 def api_state_set():
@@ -486,10 +952,27 @@ def api_state_set():
     save_state(data)
     return {"ok": True}
 
+@app.post("/api/state/patch")
+def api_state_patch():
+    """Ersetzt nur die übergebenen Top-Level-Felder ({"patch": {...}}); der Rest bleibt wie gespeichert."""
+    if not check_token(): abort(401)
+    payload = request.get_json(force=True, silent=False)
+    patch = payload.get("patch") if isinstance(payload, dict) else None
+    if not isinstance(patch, dict) or not patch.keys() <= _STATE_TYPES.keys():
+        abort(400, "patch muss ein JSON-Objekt mit universe/fixtures/defaults/buttons sein")
+    for key, value in patch.items():
+        # bool ist in Python ein int, im State aber nie gemeint
+        if not isinstance(value, _STATE_TYPES[key]) or isinstance(value, bool):
+            abort(400, f"{key} muss vom Typ {_STATE_TYPES[key].__name__} sein")
+    stop_animation()
+    data = dict(load_state())
+    data.update(patch)
+    save_state(data)
+    return {"ok": True}
+
 # --- API: Szene testweise abspielen ---
 @app.post("/api/test_scene")
 def api_test_scene():
-    global ANIM_THREAD
     if not check_token(): abort(401)
     payload = request.get_json(force=True, silent=False) or {}
     scene = payload.get("scene")
@@ -499,48 +982,77 @@ def api_test_scene():
         abort(400, "scene fehlt oder ist ungültig")
 
     universe, fixtures, _buttons, defs = load_cfg()
-    stop_animation()
+    gen = stop_animation()
 
     if (scene.get("type") or "").lower() == "sequence":
         def runner():
             try:
-                run_sequence(universe, fixtures, scene, defs)
+                run_sequence(universe, fixtures, scene, defs, gen)
             except Exception:
                 pass
-        ANIM_THREAD = threading.Thread(target=runner, daemon=True)
-        ANIM_THREAD.start()
+        threading.Thread(target=runner, daemon=True).start()
 
         def stopper():
-            time.sleep(max(0, duration_ms/1000))
-            stop_animation()
+            # nur diese Test-Sequenz beenden, nicht eine inzwischen neu gestartete Animation
+            if not _anim_wait(gen, max(0, duration_ms/1000)):
+                stop_animation(only_gen=gen)
         threading.Thread(target=stopper, daemon=True).start()
         return {"ok": True, "running": "sequence"}
 
-    target = build_dmx_frame(fixtures, scene, defs)
+    target = cached_dmx_frame(fixtures, scene, defs)
     if fade_ms <= 0:
         with SEND_LOCK:
-            send_dmx(universe, target)
+            send_dmx(universe, target, fixtures)
     else:
-        start = get_base_frame(len(target))
-        steps = calculate_fade_steps(fade_ms)
-        delay = fade_ms / 1000 / steps
-        with SEND_LOCK:
-            for i in range(1, steps + 1):
-                t = i / steps
-                mix = [int(a + (b - a) * t) for a, b in zip(start, target)]
-                send_dmx(universe, mix)
-                time.sleep(delay)
+        # läuft im Request-Thread (Antwort erst nach dem Fade), aber abbrechbar wie jeder Fade
+        _fade_runner(universe, fixtures, get_base_frame(len(target)), target, fade_ms, gen)
     return {"ok": True}
 
+# Die Admin-Seite hängt nur von Template, Assets und LOGO_URL ab → einmal rendern und
+# vorkomprimieren, neu erst wenn sich eine der Dateien ändert
+_ADMIN_ASSETS = ("admin.css", "admin.js")
+_ADMIN_PAGE: Dict = {"key": None, "variants": None, "etag": None}
+
+def _admin_page() -> Dict:
+    global _ADMIN_PAGE
+    files = [Path(app.root_path) / app.template_folder / "admin.html"]
+    files += [Path(app.static_folder) / name for name in _ADMIN_ASSETS]
+    try:
+        key = tuple(f.stat().st_mtime_ns for f in files)
+    except OSError:
+        key = None
+    page = _ADMIN_PAGE
+    if page["variants"] is None or page["key"] != key:
+        # Inhalts-Hash als ?v= – Browser cachen die Assets, bis sich der Inhalt ändert
+        asset_v = {f.name: hashlib.md5(f.read_bytes()).hexdigest()[:8] for f in files[1:]}
+        body = render_template('admin.html', logo_url=LOGO_URL, asset_v=asset_v).encode("utf-8")
+        variants = {"identity": body, "gzip": gzip.compress(body, 9)}
+        if brotli:
+            variants["br"] = brotli.compress(body, quality=11)
+        page = {"key": key, "variants": variants, "etag": hashlib.md5(body).hexdigest()}
+        _ADMIN_PAGE = page
+    return page
+
 @app.get("/admin")
 def admin_page():
     if not check_token(): abort(401)
-    return render_template('admin.html', logo_url=LOGO_URL)
+    page = _admin_page()
+    variants = page["variants"]
+    enc = next((e for e in ("br", "gzip") if e in variants and request.accept_encodings.quality(e) > 0), "identity")
+    resp = Response(variants[enc], mimetype="text/html")
+    if enc != "identity":
+        resp.headers["Content-Encoding"] = enc
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.set_etag(page["etag"] if enc == "identity" else f"{page['etag']}-{enc}")
+    return resp.make_conditional(request)
 
 # =======================
 # Main
 # =======================
 if __name__ == "__main__":
+    # SIGTERM (systemd stop) als normales Beenden behandeln, damit atexit den Dimmer sichert
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
     if not CFG_PATH.exists():
         initial = {
             "universe": 1,
@@ -556,4 +1068,10 @@ if __name__ == "__main__":
     print("  ✓ Adaptive Fade-Steps für smoothe Übergänge")
     print("  ✓ <100ms: 2-5 Steps | 100-500ms: 5-15 Steps")
     print("  ✓ 500-2000ms: 15-40 Steps | >2s: bis 150 Steps")
-    app.run(host=BIND_HOST, port=BIND_PORT)
\ No newline at end of file
+    # OLA-Zugriffe laufen nur im Eventloop-Thread des Clients, Request-Threads sind daher unkritisch
+    try:
+        from waitress import serve
+    except ImportError:
+        app.run(host=BIND_HOST, port=BIND_PORT, threaded=True)
+    else:
+        serve(app, host=BIND_HOST, port=BIND_PORT, threads=8)
\ No newline at end of file